@@ -10,11 +10,38 @@ from semantic_scholar_client import SemanticScholarAPIClient
 from top_cited_papers import get_top_cited_papers_by_date_range
 
 
+# Shared analyzer for display formatting; constructing one per paper would
+# reopen the database and rebuild its in-memory snapshot every time.
+_impact_analyzer = None
+
+
+def _get_impact_analyzer() -> JournalImpactAnalyzer:
+    global _impact_analyzer
+    if _impact_analyzer is None:
+        _impact_analyzer = JournalImpactAnalyzer()
+    return _impact_analyzer
+
+
+def months_before(date: datetime.date, months: int) -> datetime.date:
+    """Return the date the given number of calendar months earlier,
+    clamping the day for shorter months (e.g. Mar 31 -> Feb 28)."""
+    total_months = date.year * 12 + (date.month - 1) - months
+    year, month = divmod(total_months, 12)
+    month += 1
+    # Clamp to the last valid day of the target month
+    if month == 12:
+        next_month_start = datetime.date(year + 1, 1, 1)
+    else:
+        next_month_start = datetime.date(year, month + 1, 1)
+    last_day = (next_month_start - datetime.timedelta(days=1)).day
+    return datetime.date(year, month, min(date.day, last_day))
+
+
 def format_paper_details_with_impact(paper: Dict[str, Any]) -> str:
     """Format paper details including impact factor information."""
     base_details = format_paper_details(paper)
 
-    analyzer = JournalImpactAnalyzer()
+    analyzer = _get_impact_analyzer()
 
     # Get journal data
     external_ids = paper.get("externalIds", {})
@@ -117,6 +144,13 @@ def parse_arguments():
         help="Show impact factor details in output",
     )
 
+    # Caching
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk cache of API search results",
+    )
+
     # API fields
     parser.add_argument(
         "--fields",
@@ -137,7 +171,9 @@ def main():
         print("On Mac/Linux: export SEMANTIC_SCHOLAR_API_KEY=your_api_key_here")
         exit(1)
 
-    client = SemanticScholarAPIClient(api_key=SEMANTIC_SCHOLAR_API_KEY)
+    client = SemanticScholarAPIClient(
+        api_key=SEMANTIC_SCHOLAR_API_KEY, use_cache=not args.no_cache
+    )
 
     # Top cited papers
     exclude_str = "/".join(args.exclude_terms) if args.exclude_terms else "None"
@@ -145,8 +181,10 @@ def main():
         f"--- Top {args.top_n} Most Cited {args.query} Papers (Last {args.months_back} Months, Excluding {exclude_str}) ---"
     )
 
+    # Compute once and share between both searches so they agree on the
+    # date boundary (and hit the same cache keys on reruns).
     today = datetime.date.today()
-    start_date = today - datetime.timedelta(days=args.months_back * 30)
+    start_date = months_before(today, args.months_back)
 
     top_papers = get_top_cited_papers_by_date_range(
         client=client,
@@ -174,6 +212,7 @@ def main():
         max_results_per_keyword=args.max_results_per_keyword,
         exclude_terms=args.exclude_terms,
         sort_by_impact=args.sort_by_impact,
+        today=today,
     )
 
     # Display results
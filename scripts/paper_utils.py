@@ -1,6 +1,31 @@
+import functools
+import re
 from typing import Any, Dict, List
 
 
+@functools.lru_cache(maxsize=32)
+def _compile_exclude_pattern_cached(exclude_terms: tuple) -> "re.Pattern":
+    return re.compile("|".join(re.escape(term.lower()) for term in exclude_terms))
+
+
+def compile_exclude_pattern(exclude_terms: List[str]) -> "re.Pattern":
+    """Compile excluded terms into one alternation so each string is
+    scanned once instead of once per term; memoized per term list since
+    every keyword pass reuses the same terms."""
+    return _compile_exclude_pattern_cached(tuple(exclude_terms))
+
+
+def build_query_with_exclusions(query: str, exclude_terms: List[str]) -> str:
+    """Append -term negations so the API drops excluded papers server-side.
+
+    filter_excluded_terms still runs afterwards as a safety net, since
+    negation support varies by endpoint.
+    """
+    if not exclude_terms:
+        return query
+    return f"{query} " + " ".join(f"-{term}" for term in exclude_terms)
+
+
 def filter_excluded_terms(
     papers: List[Dict[str, Any]], exclude_terms: List[str]
 ) -> List[Dict[str, Any]]:
@@ -10,20 +35,29 @@ def filter_excluded_terms(
 
     filtered_papers = []
     excluded_count = 0
-    exclude_terms_lower = [term.lower() for term in exclude_terms]
+    # Hoist the per-paper attribute lookups out of the loop.
+    search = compile_exclude_pattern(exclude_terms).search
+    append = filtered_papers.append
 
     for paper in papers:
-        title = paper.get("title", "") or ""
-        abstract = paper.get("abstract", "") or ""
-        title = title.lower()
-        abstract = abstract.lower()
-
-        excluded = any(
-            term in title or term in abstract for term in exclude_terms_lower
+        # Prefer the lowercased text precomputed at ingestion.
+        title = paper.get("_title_lc")
+        if title is None:
+            title = (paper.get("title", "") or "").lower()
+
+        # Only lower-case the abstract (often 2 KB+) when the title
+        # doesn't already decide the match.
+        excluded = bool(
+            search(title)
+            or search(
+                paper["_abstract_lc"]
+                if "_abstract_lc" in paper
+                else (paper.get("abstract", "") or "").lower()
+            )
         )
 
         if not excluded:
-            filtered_papers.append(paper)
+            append(paper)
         else:
             excluded_count += 1
 
@@ -74,12 +108,16 @@ def format_paper_details(paper: Dict[str, Any]) -> str:
     else:
         tldr = "N/A"
 
-    return f"""
-    Title: {title}
-    Authors: {authors_str}
-    Journal: {journal}
-    Published: {pub_date}
-    Citations: {citations}
-    URL: {paper_url}
-    TLDR: {tldr}
-    """.strip()
+    # Join preformatted lines instead of allocating one large
+    # triple-quoted string plus its stripped copy per paper.
+    return "\n    ".join(
+        (
+            f"Title: {title}",
+            f"Authors: {authors_str}",
+            f"Journal: {journal}",
+            f"Published: {pub_date}",
+            f"Citations: {citations}",
+            f"URL: {paper_url}",
+            f"TLDR: {tldr}",
+        )
+    )
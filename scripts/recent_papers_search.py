@@ -1,9 +1,10 @@
 # recent_papers_search.py
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List
 
 from journal_impact import JournalImpactAnalyzer, sort_papers_by_impact
-from paper_utils import filter_excluded_terms
+from paper_utils import build_query_with_exclusions, filter_excluded_terms
 from semantic_scholar_client import SemanticScholarAPIClient
 
 
@@ -15,38 +16,74 @@ def get_recent_papers_by_keywords(
     max_results_per_keyword: int = 200,
     exclude_terms: List[str] = None,
     sort_by_impact: bool = True,
+    today: datetime.date = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """Get recent papers with optional impact factor sorting."""
-    today = datetime.date.today()
+    if not keywords:
+        return {}
+
+    if today is None:
+        today = datetime.date.today()
     start_date = today - datetime.timedelta(days=days_back)
 
     analyzer = JournalImpactAnalyzer() if sort_by_impact else None
-    results = {}
 
-    for keyword in keywords:
+    def search_keyword(keyword: str) -> List[Dict[str, Any]]:
         print(f"\n--- Searching for '{keyword}' in last {days_back} days ---")
         try:
             papers = client.get_all_papers_by_date_range(
                 start_date=start_date,
                 end_date=today,
-                query=keyword,
+                query=build_query_with_exclusions(keyword, exclude_terms),
                 fields=fields,
                 max_results=max_results_per_keyword,
             )
 
-            if exclude_terms:
-                papers = filter_excluded_terms(papers, exclude_terms)
-
-            if sort_by_impact and analyzer:
-                papers = sort_papers_by_impact(papers, analyzer)
-                print(f"Found {len(papers)} papers for '{keyword}' (sorted by impact)")
-            else:
-                print(f"Found {len(papers)} papers for '{keyword}'")
+            # Lower-case once at ingestion; filtering and any later passes
+            # reuse these instead of re-lowercasing the same strings.
+            for paper in papers:
+                paper["_title_lc"] = (paper.get("title") or "").lower()
+                paper["_abstract_lc"] = (paper.get("abstract") or "").lower()
 
-            results[keyword] = papers
+            return papers
 
         except Exception as e:
             print(f"Error searching for '{keyword}': {e}")
-            results[keyword] = []
+            return []
+
+    # Keyword searches are independent network I/O, so run them
+    # concurrently; the client's rate limiter keeps requests spaced out.
+    # Cap the pool so long keyword lists don't spawn one thread each only
+    # to queue behind the shared token bucket.
+    with ThreadPoolExecutor(max_workers=min(4, len(keywords))) as executor:
+        papers_per_keyword = list(executor.map(search_keyword, keywords))
+
+    # Related keywords return overlapping papers; share one dict per
+    # paperId across keyword lists so each paper is filtered/scored once
+    # (the analyzer's score cache is keyed on paperId) and tag it with
+    # every keyword that found it.
+    seen: Dict[str, Dict[str, Any]] = {}
+    for keyword, papers in zip(keywords, papers_per_keyword):
+        for i, paper in enumerate(papers):
+            paper_id = paper.get("paperId")
+            if not paper_id:
+                continue
+            canonical = seen.setdefault(paper_id, paper)
+            if canonical is not paper:
+                papers[i] = canonical
+            canonical.setdefault("_keywords", []).append(keyword)
+
+    results = {}
+    for keyword, papers in zip(keywords, papers_per_keyword):
+        if exclude_terms:
+            papers = filter_excluded_terms(papers, exclude_terms)
+
+        if sort_by_impact and analyzer:
+            papers = sort_papers_by_impact(papers, analyzer)
+            print(f"Found {len(papers)} papers for '{keyword}' (sorted by impact)")
+        else:
+            print(f"Found {len(papers)} papers for '{keyword}'")
+
+        results[keyword] = papers
 
     return results
@@ -1,33 +1,151 @@
 # semantic_scholar_client.py
 import datetime
+import email.utils
+import functools
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
 import requests
 
+try:
+    import msgspec.json
+except ImportError:  # optional; orjson/stdlib decoding still works
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json decoding still works
+    orjson = None
+
+try:
+    import httpx
+except ImportError:  # optional; requests remains the default transport
+    httpx = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # optional; only advertise br when we can decode it
+        brotli = None
+
+try:
+    import requests_cache
+except ImportError:  # optional; the result-level disk cache still works
+    requests_cache = None
+
 
 class SemanticScholarAPIClient:
     """Core client for interacting with the Semantic Scholar Academic Graph API."""
 
     BASE_URL = "https://api.semanticscholar.org/graph/v1/"
+    # Class attribute so every instance shares one string (callers may
+    # still read it as client.default_fields).
+    default_fields = "title,year,abstract,citationCount,publicationDate,venue,externalIds,authors,tldr"
+    _AUTH_ERROR_CODES = frozenset({401, 403})
     REQUEST_DELAY = 1.1
+    BURST_CAPACITY = 5  # token-bucket: requests allowed back-to-back after idle
+    CACHE_TTL = 12 * 60 * 60  # seconds; citation counts drift slowly
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        use_cache: bool = True,
+        cache_dir: str = ".s2_cache",
+    ):
         if not api_key:
             raise ValueError("API key is required for authenticated requests.")
         self.api_key = api_key
-        self.headers = {"x-api-key": self.api_key}
-        self.default_fields = "title,year,abstract,citationCount,publicationDate,venue,externalIds,authors,tldr"
-        self.last_request_time = 0
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        # Ask for compressed transfers explicitly. br is only advertised
+        # when the brotli package is importable: urllib3 cannot decode br
+        # bodies without it, so offering it unconditionally would break
+        # every response on a CDN that honors the header.
+        self.headers = {
+            "x-api-key": self.api_key,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, br" if brotli is not None else "gzip",
+        }
+        # Persistent session: reuse the TCP/TLS connection across the
+        # paginated requests instead of paying a handshake per call. When
+        # httpx[http2] is installed, concurrent requests additionally
+        # multiplex over a single HTTP/2 connection.
+        self.session = None
+        if httpx is not None:
+            try:
+                self.session = httpx.Client(
+                    http2=True,
+                    headers=self.headers,
+                    timeout=30.0,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+                )
+                self._network_errors = (httpx.HTTPError,)
+            except ImportError:  # httpx installed without the h2 extra
+                self.session = None
+        if self.session is None:
+            if use_cache and requests_cache is not None:
+                # HTTP-level cache: repeated GETs (reruns, shared pages
+                # between queries) skip the network entirely.
+                self.session = requests_cache.CachedSession(
+                    "ssapi_cache",
+                    backend="sqlite",
+                    expire_after=3600,
+                    allowable_methods=("GET",),
+                    stale_if_error=True,
+                )
+            else:
+                self.session = requests.Session()
+            self.session.headers.update(self.headers)
+            self.session.mount(
+                "https://",
+                requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=20),
+            )
+            self._network_errors = (requests.exceptions.RequestException,)
+        # Token-bucket rate limiter: refills at the sustained request rate
+        # but allows short bursts after idle periods (e.g. while parsing a
+        # response) instead of always sleeping a fixed gap. Guarded by a
+        # lock so the client can be shared across worker threads.
+        self._rate_lock = threading.Lock()
+        self._tokens = float(self.BURST_CAPACITY)
+        self._refill_rate = 1.0 / self.REQUEST_DELAY  # tokens per second
+        self._last_refill = time.monotonic()
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
 
     def _ensure_delay(self):
-        current_time = time.time()
-        elapsed_time = current_time - self.last_request_time
-        if elapsed_time < self.REQUEST_DELAY:
-            time_to_wait = self.REQUEST_DELAY - elapsed_time
-            print(f"Waiting for {time_to_wait:.2f} seconds to respect rate limit...")
-            time.sleep(time_to_wait)
-        self.last_request_time = time.time()
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.BURST_CAPACITY),
+                self._tokens + (now - self._last_refill) * self._refill_rate,
+            )
+            self._last_refill = now
+
+            if self._tokens < 1:
+                time_to_wait = (1 - self._tokens) / self._refill_rate
+                print(
+                    f"Waiting for {time_to_wait:.2f} seconds to respect rate limit..."
+                )
+                time.sleep(time_to_wait)
+                self._tokens = 0.0
+                self._last_refill = time.monotonic()
+            else:
+                self._tokens -= 1
+
+    def _refund_token(self):
+        with self._rate_lock:
+            self._tokens = min(float(self.BURST_CAPACITY), self._tokens + 1)
 
     def _make_request(
         self,
@@ -35,6 +153,7 @@ class SemanticScholarAPIClient:
         params: Dict[str, Any] = None,
         retries: int = 3,
         delay: int = 5,
+        json_body: Dict[str, Any] = None,
     ) -> Dict[str, Any]:
         self._ensure_delay()
         url = f"{self.BASE_URL}{endpoint}"
@@ -42,49 +161,49 @@ class SemanticScholarAPIClient:
         current_delay = delay
 
         while current_retries < retries:
+            # Branch on the status code directly (rather than
+            # raise_for_status) so the handling below is identical for the
+            # requests and httpx transports.
             try:
-                response = requests.get(
-                    url, params=params, headers=self.headers, timeout=30
-                )
-                response.raise_for_status()
-                return response.json()
-
-            except requests.exceptions.HTTPError as e:
-                if response.status_code == 401 or response.status_code == 403:
-                    raise ValueError(
-                        "Invalid API key or insufficient permissions."
-                    ) from e
-                elif response.status_code == 429:
-                    print(f"Rate limit hit. Retrying in {current_delay} seconds...")
-                    time.sleep(current_delay)
-                    current_retries += 1
-                    current_delay *= 2
-                elif response.status_code == 400:
-                    print(
-                        "Bad Request (400) - likely pagination limit reached. Stopping pagination."
+                if json_body is not None:
+                    response = self.session.post(
+                        url, params=params, json=json_body, timeout=30
                     )
-                    return {"data": []}
                 else:
-                    print(
-                        f"Request failed with status code {response.status_code}. Retrying..."
-                    )
-                    time.sleep(current_delay)
-                    current_retries += 1
-                    current_delay *= 2
-            except (
-                requests.exceptions.ConnectionError,
-                requests.exceptions.Timeout,
-            ) as e:
+                    response = self.session.get(url, params=params, timeout=30)
+            except self._network_errors as e:
                 print(
                     f"Network error occurred: {e}. Retrying in {current_delay} seconds..."
                 )
                 time.sleep(current_delay)
                 current_retries += 1
                 current_delay *= 2
-            except requests.exceptions.RequestException as e:
+                continue
+
+            # A cache hit consumed no server-side quota; give the token back.
+            if getattr(response, "from_cache", False):
+                self._refund_token()
+
+            status_code = response.status_code
+            if status_code == 200:
+                return self._decode_response(response)
+            elif status_code in self._AUTH_ERROR_CODES:
+                raise ValueError("Invalid API key or insufficient permissions.")
+            elif status_code == 429:
+                wait = self._retry_after_seconds(response, current_delay)
+                # Jitter to avoid thundering-herd retries from worker threads
+                wait *= 0.8 + 0.4 * random.random()
+                print(f"Rate limit hit. Retrying in {wait:.1f} seconds...")
+                time.sleep(wait)
+                current_retries += 1
+                current_delay = max(current_delay * 2, wait)
+            elif status_code == 400:
                 print(
-                    f"An unexpected request error occurred: {e}. Retrying in {current_delay} seconds..."
+                    "Bad Request (400) - likely pagination limit reached. Stopping pagination."
                 )
+                return {"data": []}
+            else:
+                print(f"Request failed with status code {status_code}. Retrying...")
                 time.sleep(current_delay)
                 current_retries += 1
                 current_delay *= 2
@@ -92,9 +211,62 @@ class SemanticScholarAPIClient:
         print(f"Request failed after {retries} retries. Returning empty result.")
         return {"data": []}
 
-    def _format_date_range(
-        self, start_date: datetime.date, end_date: datetime.date
-    ) -> str:
+    @staticmethod
+    def _retry_after_seconds(response: Any, fallback: float) -> float:
+        """Honor the server's Retry-After header (seconds or HTTP date),
+        falling back to the client-side delay when absent or malformed."""
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return fallback
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            return max(0.0, (retry_at - now).total_seconds())
+        except (TypeError, ValueError):
+            return fallback
+
+    @staticmethod
+    def _decode_response(response: Any) -> Dict[str, Any]:
+        """Decode a JSON response, using the fastest installed parser
+        (msgspec, then orjson, then stdlib json)."""
+        if msgspec is not None:
+            return msgspec.json.decode(response.content)
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+
+    def _cache_path(self, key: Any) -> str:
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _cache_get(self, key: Any) -> Optional[List[Dict[str, Any]]]:
+        """Return cached papers for the key, or None if absent/expired."""
+        if not self.use_cache:
+            return None
+        path = self._cache_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.CACHE_TTL:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_set(self, key: Any, papers: List[Dict[str, Any]]):
+        if not self.use_cache:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(key), "w") as f:
+                json.dump(papers, f)
+        except OSError as e:
+            print(f"Warning: could not write search cache: {e}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _format_date_range(start_date: datetime.date, end_date: datetime.date) -> str:
         return f"{start_date.strftime('%Y-%m-%d')}:{end_date.strftime('%Y-%m-%d')}"
 
     def search_papers(
@@ -143,61 +315,132 @@ class SemanticScholarAPIClient:
         query: str = "research",
         fields: str = None,
         max_results: int = 500,
+        concurrency: int = 4,
     ) -> List[Dict[str, Any]]:
-        """Retrieves papers published within a specific date range, handling pagination gracefully."""
-        all_papers = []
+        """Retrieves papers published within a specific date range, fetching
+        pagination pages concurrently and handling failures gracefully."""
+        cache_key = (
+            "papers_by_date_range",
+            query,
+            start_date.isoformat(),
+            end_date.isoformat(),
+            fields or self.default_fields,
+            max_results,
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print(
+                f"Using cached results for '{query}' ({start_date} to {end_date}): "
+                f"{len(cached)} papers."
+            )
+            return cached
+
         limit = 100
-        offset = 0
-        consecutive_failures = 0
-        max_consecutive_failures = 2
+        # Hoist the per-page invariants out of the fetch loop.
+        date_range_str = self._format_date_range(start_date, end_date)
+        resolved_fields = fields if fields else self.default_fields
 
         print(
             f"Fetching papers from {start_date} to {end_date} with query '{query}'..."
         )
 
-        while len(all_papers) < max_results:
+        def fetch_page(offset: int) -> Optional[List[Dict[str, Any]]]:
             try:
-                papers_page = self.get_papers_by_date_range(
-                    start_date,
-                    end_date,
+                return self.search_papers(
                     query=query,
-                    fields=fields,
+                    fields=resolved_fields,
+                    date_range=date_range_str,
                     limit=limit,
                     offset=offset,
                 )
+            except self._network_errors as e:
+                print(f"Error fetching page at offset {offset}: {e}")
+                return None
 
-                if not papers_page:
-                    print(
-                        f"No more papers found. Stopping pagination at {len(all_papers)} papers."
-                    )
-                    break
-
-                all_papers.extend(papers_page)
-                offset += limit
-                consecutive_failures = 0
-                print(f"Fetched {len(all_papers)} papers so far...")
+        # Page offsets are known up front, so fetch them concurrently —
+        # but submit them one wave of `concurrency` at a time, so a
+        # short/empty/failed page actually ends the run instead of
+        # leaving queued offsets to burn rate-limited requests.
+        offsets = range(0, max_results, limit)
+        if not offsets:  # max_results=0; an empty pool would raise
+            return []
+        workers = min(concurrency, len(offsets))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Collect whole pages and flatten once at the end rather than
+            # growing (and reallocating) one list page by page.
+            pages = []
+            fetched = 0
+            done = False
+            for wave_start in range(0, len(offsets), workers):
+                wave = offsets[wave_start : wave_start + workers]
+                for papers_page in executor.map(fetch_page, wave):
+                    if papers_page is None:
+                        print(
+                            f"Stopping pagination after a failed page at {fetched} papers."
+                        )
+                        done = True
+                        break
 
-                if len(papers_page) < limit:
-                    print(
-                        f"Received fewer papers than requested ({len(papers_page)} < {limit}). End of results."
-                    )
-                    break
+                    if not papers_page:
+                        print(
+                            f"No more papers found. Stopping pagination at {fetched} papers."
+                        )
+                        done = True
+                        break
 
-            except requests.exceptions.RequestException as e:
-                consecutive_failures += 1
-                print(f"Error during pagination (attempt {consecutive_failures}): {e}")
+                    pages.append(papers_page)
+                    fetched += len(papers_page)
+                    print(f"Fetched {fetched} papers so far...")
 
-                if consecutive_failures >= max_consecutive_failures:
-                    print(
-                        f"Too many consecutive failures ({consecutive_failures}). Stopping pagination."
-                    )
+                    if len(papers_page) < limit:
+                        print(
+                            f"Received fewer papers than requested ({len(papers_page)} < {limit}). End of results."
+                        )
+                        done = True
+                        break
+                if done:
                     break
 
-                time.sleep(5)
-
+        all_papers = list(itertools.chain.from_iterable(pages))
         print(f"Final result: {len(all_papers)} papers fetched.")
+        self._cache_set(cache_key, all_papers)
         return all_papers
 
+    def iter_papers_by_date_range(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        query: str = "research",
+        fields: str = None,
+        max_results: int = 500,
+    ):
+        """Yield papers one page at a time, letting callers stop pagination
+        early instead of fetching the full max_results up front."""
+        limit = 100
+        date_range_str = self._format_date_range(start_date, end_date)
+        resolved_fields = fields if fields else self.default_fields
+
+        for offset in range(0, max_results, limit):
+            try:
+                papers_page = self.search_papers(
+                    query=query,
+                    fields=resolved_fields,
+                    date_range=date_range_str,
+                    limit=limit,
+                    offset=offset,
+                )
+            except self._network_errors as e:
+                print(f"Error fetching page at offset {offset}: {e}")
+                return
+
+            if not papers_page:
+                return
+
+            yield from papers_page
+
+            if len(papers_page) < limit:
+                return
+
     def get_paper_details(
         self, paper_id: str, fields: str = None
     ) -> Optional[Dict[str, Any]]:
@@ -208,3 +451,26 @@ class SemanticScholarAPIClient:
         except requests.exceptions.RequestException as e:
             print(f"Error fetching details for paper {paper_id}: {e}")
             return None
+
+    def get_paper_details_batch(
+        self, paper_ids: List[str], fields: str = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Fetch details for many papers via the paper/batch endpoint.
+
+        One POST per 500 IDs instead of one rate-limited GET per paper.
+        Results align with paper_ids; unknown IDs come back as None.
+        """
+        params = {"fields": fields if fields else self.default_fields}
+        results: List[Optional[Dict[str, Any]]] = []
+
+        for i in range(0, len(paper_ids), 500):
+            chunk = paper_ids[i : i + 500]
+            response_data = self._make_request(
+                "paper/batch", params=params, json_body={"ids": chunk}
+            )
+            if isinstance(response_data, list):
+                results.extend(response_data)
+            else:  # error path returns {"data": []}
+                results.extend([None] * len(chunk))
+
+        return results
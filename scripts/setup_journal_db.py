@@ -1,10 +1,47 @@
 # setup_journal_db.py
-import time
-
 import requests
+from urllib3.util.retry import Retry
 
 from journal_impact import JournalImpactAnalyzer
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json decoding still works
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # optional; only advertise br when we can decode it
+        brotli = None
+
+# Shared session: one TLS connection across all cursor pages, with
+# transient errors (including 429/5xx) retried at the transport level
+# instead of aborting the whole population run.
+_SESSION = requests.Session()
+_SESSION.headers.update(
+    {
+        "User-Agent": "JournalImpactTool/1.0",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, br" if brotli is not None else "gzip",
+    }
+)
+_SESSION.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=10,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+
 
 def populate_journal_database(max_journals: int = 1000):
     """Populate database with OpenAlex journal data."""
@@ -14,27 +51,27 @@ def populate_journal_database(max_journals: int = 1000):
     url = "https://api.openalex.org/sources"
     params = {"filter": "type:journal,works_count:>100", "per-page": 200, "cursor": "*"}
 
-    headers = {"User-Agent": "JournalImpactTool/1.0", "Accept": "application/json"}
-
     processed = 0
 
     while processed < max_journals:
         try:
-            response = requests.get(url, headers=headers, params=params)
-            time.sleep(0.1)  # Rate limiting
+            response = _SESSION.get(url, params=params, timeout=30)
 
             if response.status_code != 200:
                 print(f"API error: {response.status_code}")
                 break
 
-            data = response.json()
+            data = (
+                orjson.loads(response.content) if orjson is not None else response.json()
+            )
             journals = data.get("results", [])
 
             if not journals:
                 break
 
+            batch = []
             for journal in journals:
-                if processed >= max_journals:
+                if processed + len(batch) >= max_journals:
                     break
 
                 # Extract ISSN data safely
@@ -54,11 +91,13 @@ def populate_journal_database(max_journals: int = 1000):
                 }
 
                 if issn_l:  # Only add if we have ISSN
-                    analyzer.add_journal(journal_data)
-                    processed += 1
+                    batch.append(journal_data)
 
-                    if processed % 100 == 0:
-                        print(f"Processed {processed} journals...")
+            # One transaction (and fsync) per page instead of per journal
+            analyzer.add_journals_bulk(batch)
+            processed += len(batch)
+            if batch:
+                print(f"Processed {processed} journals...")
 
             # Get next page
             meta = data.get("meta", {})
@@ -68,7 +107,8 @@ def populate_journal_database(max_journals: int = 1000):
             else:
                 break
 
-        except Exception as e:
+        except requests.exceptions.RequestException as e:
+            # Only reached after the adapter's retries are exhausted
             print(f"Error: {e}")
             break
 
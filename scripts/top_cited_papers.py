@@ -1,53 +1,190 @@
 # top_cited_papers.py
 import datetime
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List
 
-from paper_utils import filter_excluded_terms
+from paper_utils import build_query_with_exclusions, compile_exclude_pattern
 
 from semantic_scholar_client import SemanticScholarAPIClient
 
+# Stop paginating once this many consecutive papers fail to displace any
+# current top-N entry; by then later pages rarely change the result.
+EARLY_STOP_MISSES = 300
 
-def get_top_cited_papers_by_date_range(
+
+def iter_filtered_papers(
     client: SemanticScholarAPIClient,
     start_date: datetime.date,
     end_date: datetime.date,
     query: str,
-    top_n: int = 5,
     fields: str = None,
     max_fetch: int = 1000,
     exclude_terms: List[str] = None,
-) -> List[Dict[str, Any]]:
-    """Get the top N most cited papers for a query within a date range."""
-    print(
-        f"Fetching papers for '{query}' from {start_date} to {end_date} to find top {top_n} most cited..."
-    )
-
-    all_papers = client.get_all_papers_by_date_range(
+    stats: Dict[str, int] = None,
+):
+    """Stream papers for a query with exclusion filtering fused in.
+
+    Yields kept papers so consumers never materialize an intermediate
+    list between fetch and selection. Running "total" and "excluded"
+    counts are maintained in the optional ``stats`` dict, which stays
+    accurate even when every trailing paper is filtered out (a yielded
+    counter would miss excluded papers after the last kept one).
+    """
+    if stats is None:
+        stats = {}
+    stats["total"] = 0
+    stats["excluded"] = 0
+    pattern = compile_exclude_pattern(exclude_terms) if exclude_terms else None
+
+    for paper in client.iter_papers_by_date_range(
         start_date=start_date,
         end_date=end_date,
-        query=query,
+        query=build_query_with_exclusions(query, exclude_terms),
         fields=fields,
         max_results=max_fetch,
+    ):
+        stats["total"] += 1
+
+        if pattern and (
+            pattern.search((paper.get("title") or "").lower())
+            or pattern.search((paper.get("abstract") or "").lower())
+        ):
+            stats["excluded"] += 1
+            continue
+
+        yield paper
+
+
+def get_top_cited_papers_by_date_range(
+    client: SemanticScholarAPIClient,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    query: str,
+    top_n: int = 5,
+    fields: str = None,
+    max_fetch: int = 1000,
+    exclude_terms: List[str] = None,
+) -> List[Dict[str, Any]]:
+    """Get the top N most cited papers for a query within a date range.
+
+    Streams pagination pages, filters and heap-selects on the fly, and
+    stops fetching early once the top N has stabilized. The selected
+    top-N list is cached on disk via the client's result cache, since
+    the streaming path bypasses the per-run cache in
+    get_all_papers_by_date_range.
+    """
+    cache_key = (
+        "top_cited",
+        query,
+        start_date.isoformat(),
+        end_date.isoformat(),
+        fields or client.default_fields,
+        top_n,
+        max_fetch,
+        exclude_terms or [],
     )
+    cached = client._cache_get(cache_key)
+    if cached is not None:
+        print(
+            f"Using cached top {len(cached)} papers for '{query}' "
+            f"({start_date} to {end_date})."
+        )
+        return cached
 
-    if exclude_terms:
-        all_papers = filter_excluded_terms(all_papers, exclude_terms)
+    print(
+        f"Fetching papers for '{query}' from {start_date} to {end_date} to find top {top_n} most cited..."
+    )
 
-    if not all_papers:
+    heap = []  # (citationCount, tiebreak, paper)
+    stats = {"total": 0, "excluded": 0}
+    misses = 0
+    for i, paper in enumerate(
+        iter_filtered_papers(
+            client=client,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+            fields=fields,
+            max_fetch=max_fetch,
+            exclude_terms=exclude_terms,
+            stats=stats,
+        )
+    ):
+        citations = paper.get("citationCount", 0) or 0
+        paper.setdefault("citationCount", 0)
+        if len(heap) < top_n:
+            heapq.heappush(heap, (citations, i, paper))
+            misses = 0
+        elif citations > heap[0][0]:
+            heapq.heapreplace(heap, (citations, i, paper))
+            misses = 0
+        else:
+            misses += 1
+            if misses >= EARLY_STOP_MISSES:
+                print(
+                    f"Top {top_n} unchanged for {misses} papers. Stopping early at {stats['total']} papers."
+                )
+                break
+
+    total = stats["total"]
+    excluded_count = stats["excluded"]
+    if excluded_count > 0:
+        print(
+            f"Excluded {excluded_count} papers containing excluded terms. "
+            f"{total - excluded_count} papers remaining."
+        )
+
+    if not heap:
         print(f"No papers found for query '{query}' in the specified date range.")
+        client._cache_set(cache_key, [])
         return []
 
-    sorted_papers = sorted(
-        all_papers, key=lambda x: x.get("citationCount", 0), reverse=True
-    )
-    top_papers = sorted_papers[:top_n]
+    heap.sort(key=lambda entry: (-entry[0], entry[1]))
+    top_papers = [paper for _, _, paper in heap]
 
     print(
-        f"Selected top {len(top_papers)} most cited papers from {len(all_papers)} total papers."
+        f"Selected top {len(top_papers)} most cited papers from {total} total papers."
     )
+    client._cache_set(cache_key, top_papers)
     return top_papers
 
 
+def get_top_cited_papers_for_queries(
+    client: SemanticScholarAPIClient,
+    queries: List[str],
+    start_date: datetime.date,
+    end_date: datetime.date,
+    top_n: int = 5,
+    fields: str = None,
+    max_fetch: int = 1000,
+    exclude_terms: List[str] = None,
+    max_workers: int = 4,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Run top-cited searches for several queries concurrently.
+
+    Each query is an independent multi-page fetch; the client's shared
+    rate limiter keeps the aggregate request rate within quota.
+    """
+    if not queries:
+        return {}
+
+    def run_query(query: str) -> List[Dict[str, Any]]:
+        return get_top_cited_papers_by_date_range(
+            client=client,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+            top_n=top_n,
+            fields=fields,
+            max_fetch=max_fetch,
+            exclude_terms=exclude_terms,
+        )
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+        return dict(zip(queries, executor.map(run_query, queries)))
+
+
 if __name__ == "__main__":
     import os
 